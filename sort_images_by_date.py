@@ -9,15 +9,21 @@ based on their capture date.
 import os
 import sys
 import shutil
+import stat
 import argparse
 import csv
+import json
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict
-import re
+import string
 
 try:
-    from PIL import Image, ExifTags
+    from PIL import Image
+    import numpy as np
     from tqdm import tqdm
 except ImportError as e:
     print(f"Error: Required library not found: {e}")
@@ -25,14 +31,443 @@ except ImportError as e:
     sys.exit(1)
 
 
+# Number of images handed to a worker process at once (amortizes pickling overhead)
+ANALYSIS_CHUNKSIZE = 32
+
+# Number of copies kept in flight during the copy phase
+COPY_WORKERS = 8
+
+# Number of threads reading file metadata (stat) before the analysis
+STAT_WORKERS = 16
+
+# Progress bars redraw at most twice a second, skip ETA smoothing and are
+# disabled when the output is not a terminal (e.g. redirected to a log file)
+PROGRESS_BAR_OPTIONS = {'mininterval': 0.5, 'smoothing': 0, 'disable': None}
+
+# Progress bars check the redraw interval only every 1/PROGRESS_BAR_STEPS of the total
+PROGRESS_BAR_STEPS = 200
+
+# Image types whose EXIF data is read (all others use the filesystem date)
+EXIF_EXTENSIONS = frozenset({'.jpg', '.jpeg'})
+
+# Metadata cache file in the destination directory (--cache)
+CACHE_FILENAME = '.picsort.cache'
+
+# JPEG markers used to locate the EXIF segment
+JPEG_SOI = b'\xff\xd8'
+JPEG_APP1 = 0xE1
+JPEG_SOS = 0xDA
+JPEG_EOI = 0xD9
+
+# EXIF tag ids as defined by the EXIF standard (plain ints, no tag name lookups)
+EXIF_IFD_ID = 0x8769
+GPS_INFO_ID = 0x8825
+DATETIME_ORIGINAL_ID = 0x9003
+GPS_LATITUDE_REF_ID = 1
+GPS_LATITUDE_ID = 2
+GPS_LONGITUDE_REF_ID = 3
+GPS_LONGITUDE_ID = 4
+
+# Translation table replacing every ASCII character except [A-Za-z0-9_.-] with '_'
+SAFE_NAME_CHARS = frozenset(string.ascii_letters + string.digits + '-_.')
+SAFE_NAME_TABLE = str.maketrans({chr(i): '_' for i in range(128) if chr(i) not in SAFE_NAME_CHARS})
+
+
+def find_exif_segment(f) -> Optional[bytes]:
+    """
+    Returns the EXIF payload of a JPEG file opened in binary mode.
+
+    Walks the marker segments from the start of the file and stops at the
+    EXIF APP1 segment, so only the bytes in front of it are read. Returns
+    None if the file has no EXIF segment.
+    """
+    while True:
+        prefix = f.read(1)
+        if prefix != b'\xff':
+            return None
+        # Any number of 0xFF fill bytes may precede the marker byte
+        marker = 0xFF
+        while marker == 0xFF:
+            byte = f.read(1)
+            if not byte:
+                return None
+            marker = byte[0]
+
+        # EXIF must appear before the image data starts
+        if marker in (JPEG_SOS, JPEG_EOI):
+            return None
+
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = int.from_bytes(length_bytes, 'big')
+        # The length includes its own two bytes
+        if length < 2:
+            return None
+
+        if marker == JPEG_APP1:
+            data = f.read(length - 2)
+            if data.startswith(b'Exif\x00\x00'):
+                return data
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_exif(image_path: Path) -> Optional[Image.Exif]:
+    """
+    Reads the EXIF data of an image without loading the whole file.
+
+    The EXIF segment is located directly in the JPEG marker structure and
+    handed to PIL's EXIF parser; files that do not look like a JPEG go
+    through Image.open instead. Only JPEG files are read: for PNG, PIL
+    would stream the entire file looking for EXIF chunks that are almost
+    never there, so PNGs use the filesystem date. The returned Exif object
+    only decodes the IFDs that are requested.
+    """
+    if image_path.suffix.lower() not in EXIF_EXTENSIONS:
+        return None
+
+    with open(image_path, 'rb') as f:
+        if f.read(2) == JPEG_SOI:
+            data = find_exif_segment(f)
+            exif = Image.Exif()
+            if data:
+                exif.load(data)
+            return exif
+
+    # Not a JPEG despite the extension - let PIL identify it
+    with Image.open(image_path) as img:
+        exif = img.getexif()
+        # Decode the needed IFDs while the file is still open (they are cached)
+        exif.get_ifd(EXIF_IFD_ID)
+        exif.get_ifd(GPS_INFO_ID)
+        return exif
+
+
+def sanitize_name(name: str) -> str:
+    """Replaces all characters that are not word characters, '-' or '.' with '_'."""
+    if name.isascii():
+        return name.translate(SAFE_NAME_TABLE)
+    # Keep non-ASCII letters and digits (Unicode word characters)
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+
+
+def format_date_stamp(date: datetime) -> str:
+    """Formats a date as YYYYMMDD_HHMMSS for filenames."""
+    # %-formatting of the fields is about twice as fast as strftime
+    return '%04d%02d%02d_%02d%02d%02d' % (date.year, date.month, date.day, date.hour, date.minute, date.second)
+
+
+def format_date_time(date: datetime) -> str:
+    """Formats a date as YYYY-MM-DD HH:MM:SS for output and the CSV file."""
+    return '%04d-%02d-%02d %02d:%02d:%02d' % (date.year, date.month, date.day, date.hour, date.minute, date.second)
+
+
+def dms_to_degrees(gps_dms: List[tuple]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts GPS coordinates of many images from DMS (Degrees, Minutes, Seconds) to decimal degrees.
+
+    Each entry is (lat_dms, lat_ref, lon_dms, lon_ref) as returned by
+    get_gps_dms(), with DMS values as (numerator, denominator) pairs; all
+    entries are converted in one vectorized pass.
+    Returns the arrays of latitudes and longitudes.
+    """
+    lat_dms, lat_ref, lon_dms, lon_ref = zip(*gps_dms)
+    lat = np.array(lat_dms, dtype=np.float64)
+    lon = np.array(lon_dms, dtype=np.float64)
+
+    # Resolve the rationals (a zero denominator yields nan/inf like an invalid EXIF value)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lat = lat[..., 0] / lat[..., 1]
+        lon = lon[..., 0] / lon[..., 1]
+
+    lat = lat[:, 0] + (lat[:, 1] / 60.0) + (lat[:, 2] / 3600.0)
+    lon = lon[:, 0] + (lon[:, 1] / 60.0) + (lon[:, 2] / 3600.0)
+
+    # Consider reference
+    lat = np.where(np.array(lat_ref, dtype=object) == 'S', -lat, lat)
+    lon = np.where(np.array(lon_ref, dtype=object) == 'W', -lon, lon)
+
+    return lat, lon
+
+
+def to_rational_pairs(values) -> tuple:
+    """Splits EXIF rationals into (numerator, denominator) pairs for dms_to_degrees()."""
+    return tuple((value.numerator, value.denominator) if hasattr(value, 'denominator') else (float(value), 1)
+                 for value in values)
+
+
+def get_gps_dms(image_path: Path, exif: Optional[Image.Exif]) -> Optional[tuple]:
+    """
+    Extracts the raw GPS coordinates from the EXIF data of an image.
+
+    Returns (lat_dms, lat_ref, lon_dms, lon_ref); the conversion to decimal
+    degrees is done for all images at once by dms_to_degrees().
+    """
+    try:
+        if exif is not None:
+            # Decode only the GPS IFD
+            gps_info = exif.get_ifd(GPS_INFO_ID)
+            try:
+                # GPS IFD has structure: {1: 'N', 2: (lat_deg, lat_min, lat_sec), 3: 'E', 4: (lon_deg, lon_min, lon_sec)}
+                if GPS_LATITUDE_ID in gps_info and GPS_LONGITUDE_ID in gps_info:
+                    lat_dms = to_rational_pairs(gps_info[GPS_LATITUDE_ID])
+                    lon_dms = to_rational_pairs(gps_info[GPS_LONGITUDE_ID])
+                    if len(lat_dms) != 3 or len(lon_dms) != 3:
+                        raise ValueError("expected (degrees, minutes, seconds)")
+
+                    return (lat_dms, gps_info.get(GPS_LATITUDE_REF_ID),
+                            lon_dms, gps_info.get(GPS_LONGITUDE_REF_ID))
+            except Exception as e:
+                print(f"Error during GPS conversion for {image_path}: {e}")
+
+    except Exception as e:
+        print(f"Warning: Could not read GPS data for {image_path}: {e}")
+
+    return None
+
+
+def parse_exif_date(date_str: str) -> datetime:
+    """Parses an EXIF date (format: YYYY:MM:DD HH:MM:SS)."""
+    # The format is fixed-width, so slicing is much cheaper than strptime;
+    # anything not exactly in that shape is left to strptime to accept or reject
+    if (len(date_str) == 19 and date_str[4] == date_str[7] == ':' and date_str[10] == ' '
+            and date_str[13] == date_str[16] == ':'
+            and (date_str[0:4] + date_str[5:7] + date_str[8:10]
+                 + date_str[11:13] + date_str[14:16] + date_str[17:19]).isdigit()):
+        try:
+            return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]),
+                            int(date_str[11:13]), int(date_str[14:16]), int(date_str[17:19]))
+        except ValueError:
+            pass
+    return datetime.strptime(date_str, '%Y:%m:%d %H:%M:%S')
+
+
+def get_image_date(image_path: Path, exif: Optional[Image.Exif],
+                   stat_result: Optional[os.stat_result] = None) -> Tuple[datetime, str, str, Optional[os.stat_result]]:
+    """
+    Extracts the capture date from the EXIF data of an image, falling back to the filesystem date.
+
+    A stat result read beforehand is used for the fallback instead of reading
+    it again. Returns date, source description, the statistics key of the
+    date source and the stat result of the file if one is available.
+    """
+    try:
+        # Try to use EXIF data
+        if exif is not None:
+            # DateTimeOriginal lives in the Exif sub-IFD, decode only that one;
+            # some writers put it into IFD0 instead
+            date_str = exif.get_ifd(EXIF_IFD_ID).get(DATETIME_ORIGINAL_ID) or exif.get(DATETIME_ORIGINAL_ID)
+            if date_str:
+                try:
+                    date = parse_exif_date(date_str)
+                    return date, f"EXIF: {date_str}", 'exif_files', stat_result
+                except ValueError:
+                    pass
+
+    except Exception as e:
+        print(f"Warning: Could not read EXIF data for {image_path}: {e}")
+
+    # Fallback: Use filesystem creation date
+    try:
+        if stat_result is None:
+            stat_result = image_path.stat()
+        # Use the earliest available date; prefer the real creation time where the
+        # platform reports it (macOS/BSD/Windows), as st_ctime is the change time there
+        created = getattr(stat_result, 'st_birthtime', None) or stat_result.st_ctime
+        date = datetime.fromtimestamp(min(created, stat_result.st_mtime))
+        return date, f"Filesystem: {format_date_time(date)}", 'filesystem_date_files', stat_result
+    except Exception as e:
+        print(f"Warning: Could not read filesystem date for {image_path}: {e}")
+        # Last fallback: Current date
+        date = datetime.now()
+        return date, f"Current date: {format_date_time(date)}", 'current_date_files', None
+
+
+def extract_metadata(image_path: Path, include_gps: bool,
+                     stat_result: Optional[os.stat_result] = None) -> Tuple[datetime, str, str, Optional[os.stat_result], Optional[tuple]]:
+    """
+    Reads the EXIF data of an image once and extracts date and GPS data from it.
+
+    Returns the result of get_image_date() followed by the raw GPS data.
+    """
+    try:
+        exif = read_exif(image_path)
+    except Exception as e:
+        print(f"Warning: Could not read EXIF data for {image_path}: {e}")
+        exif = None
+
+    date, source, stats_key, stat_result = get_image_date(image_path, exif, stat_result)
+    gps_dms = get_gps_dms(image_path, exif) if include_gps else None
+    return date, source, stats_key, stat_result, gps_dms
+
+
+def get_subfolder_name(image_path: Path, source_prefix: str) -> str:
+    """
+    Extracts the name of the subfolder relative to the source directory.
+
+    The image paths start with the source directory, so the relative path
+    is found by slicing off source_prefix (the source path with separator).
+    """
+    parts = str(image_path)[len(source_prefix):].split(os.sep, 1)
+    
+    # If image is directly in source directory
+    if len(parts) == 1:
+        return ""
+        
+    return f"_{parts[0]}_"
+
+
+def analyze_image(image_path: Path, stat_result: Optional[os.stat_result], source_prefix: str,
+                  include_gps: bool, include_dir: bool) -> tuple:
+    """
+    Collects date, GPS and subfolder data of a single image.
+
+    Runs in a worker process or thread, so it must not touch any shared
+    state. The returned statistics key is tallied by the main process; on
+    failure the date is None and the source holds the error message.
+    """
+    try:
+        date, source, stats_key, stat_result, gps_dms = extract_metadata(image_path, include_gps, stat_result)
+        subfolder = get_subfolder_name(image_path, source_prefix) if include_dir else ""
+        return image_path, date, source, stats_key, gps_dms, subfolder, stat_result
+    except Exception as e:
+        return image_path, None, str(e), 'error_files', None, "", None
+
+
+def stat_files(paths: List[Path]) -> List[Optional[os.stat_result]]:
+    """
+    Reads the stat results of all files concurrently (None where it fails).
+
+    Stat calls mostly wait for the filesystem, so running them in parallel
+    helps most on network drives.
+    """
+    def stat_or_none(path: Path) -> Optional[os.stat_result]:
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
+    
+    with ThreadPoolExecutor(max_workers=STAT_WORKERS) as executor:
+        return list(executor.map(stat_or_none, paths))
+
+
+def copy_file_contents(source_path: Path, dest_path: str) -> None:
+    """
+    Copies the contents of a file (no metadata).
+
+    Uses os.copy_file_range where available, which copies inside the kernel
+    and creates reflinks on copy-on-write filesystems (Btrfs, XFS). Falls
+    back to shutil.copyfile if the filesystems do not support it.
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(source_path, 'rb') as fsrc, open(dest_path, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining <= 0:
+                return
+        except OSError:
+            # e.g. copies across filesystems on older kernels
+            pass
+
+    shutil.copyfile(source_path, dest_path)
+
+
+class MetadataCache:
+    """
+    Persistent cache of image analysis results.
+
+    Entries are keyed by path and only used while the file size and
+    modification time are unchanged. Raises sqlite3.Error if the cache file
+    cannot be used.
+    """
+    
+    COLUMNS = ['path', 'size', 'mtime_ns', 'date', 'source', 'stats_key', 'gps_checked', 'gps']
+    
+    def __init__(self, cache_path: Path):
+        self.connection = sqlite3.connect(cache_path)
+        try:
+            # A table with a different layout (e.g. from another version) is rebuilt
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(metadata)")]
+            if columns and columns != self.COLUMNS:
+                self.connection.execute("DROP TABLE metadata")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, date TEXT, "
+                "source TEXT, stats_key TEXT, gps_checked INTEGER, gps TEXT)"
+            )
+            # Load all entries at once instead of querying per image
+            self.entries = {row[0]: row[1:] for row in self.connection.execute("SELECT * FROM metadata")}
+        except sqlite3.Error:
+            self.connection.close()
+            raise
+    
+    def lookup(self, image_path: Path, stat_result: os.stat_result, include_gps: bool) -> Optional[tuple]:
+        """Returns (date, source, stats_key, gps_dms) of an unchanged image, or None."""
+        entry = self.entries.get(str(image_path))
+        if entry is None:
+            return None
+            
+        size, mtime_ns, date, source, stats_key, gps_checked, gps = entry
+        if size != stat_result.st_size or mtime_ns != stat_result.st_mtime_ns:
+            return None
+        if include_gps and not gps_checked:
+            return None
+            
+        # Damaged entries are treated as missing and analyzed again
+        try:
+            gps_dms = json.loads(gps) if include_gps and gps else None
+            return datetime.fromisoformat(date), source, stats_key, gps_dms
+        except (TypeError, ValueError):
+            return None
+    
+    def store(self, image_path: Path, stat_result: os.stat_result, date: Optional[datetime], source: str,
+              stats_key: str, include_gps: bool, gps_dms: Optional[tuple]) -> None:
+        """Stores the analysis result of an image (failed and current-date results are not cached)."""
+        if stats_key not in ('exif_files', 'filesystem_date_files'):
+            return
+            
+        try:
+            gps = json.dumps(gps_dms) if gps_dms else None
+        except (TypeError, ValueError):
+            return
+            
+        self.connection.execute(
+            "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (str(image_path), stat_result.st_size, stat_result.st_mtime_ns, date.isoformat(),
+             source, stats_key, int(include_gps), gps)
+        )
+    
+    def close(self) -> None:
+        """Commits all stored entries and closes the cache."""
+        self.connection.commit()
+        self.connection.close()
+
+
 class ImageSorter:
     """Main class for image sorting."""
     
-    def __init__(self, source_dir: str, dest_dir: str, include_gps: bool = False, include_dir: bool = False):
+    def __init__(self, source_dir: str, dest_dir: str, include_gps: bool = False, include_dir: bool = False,
+                 preserve_times: bool = False, verbose: bool = False, use_threads: bool = False,
+                 use_cache: bool = False, link_files: bool = False):
         self.source_dir = Path(source_dir)
+        # Source prefix of the found image paths (Path drops a leading './')
+        self._source_prefix = '' if str(self.source_dir) == '.' else str(self.source_dir).rstrip(os.sep) + os.sep
         self.dest_dir = Path(dest_dir)
+        # Destination prefix for building copy targets by string concatenation
+        self._dest_str = str(self.dest_dir) + os.sep
         self.include_gps = include_gps
         self.include_dir = include_dir
+        self.preserve_times = preserve_times
+        self.verbose = verbose
+        self.use_threads = use_threads
+        self.use_cache = use_cache
+        self.link_files = link_files
         self.supported_extensions = {'.jpg', '.jpeg', '.png'}
         self.stats = {
             'total_files': 0,
@@ -43,8 +478,14 @@ class ImageSorter:
             'copied_files': 0,
             'error_files': 0
         }
-        # List for GPS data for CSV export
-        self.gps_data = []
+        # CSV file for GPS data, created when the first GPS entry is written
+        self._gps_csv_file = None
+        self._gps_csv_writer = None
+        self._gps_csv_failed = False
+        self.gps_entries = 0
+        # Case-folded filenames present in the destination directory (names that
+        # differ only in case are the same file on macOS and Windows)
+        self._dest_names = set()
         
     def find_image_files(self) -> List[Path]:
         """Finds all image files in the source directory recursively."""
@@ -55,152 +496,41 @@ class ImageSorter:
             
         print(f"Searching directory: {self.source_dir}")
         
-        for file_path in self.source_dir.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in self.supported_extensions:
-                image_files.append(file_path)
+        # Walk with os.scandir: directory entries carry their file type, so no
+        # extra stat call is needed, and a Path is only built for matches
+        extensions = self.supported_extensions
+        pending_dirs = [str(self.source_dir)]
+        while pending_dirs:
+            directory = pending_dirs.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError as e:
+                # Skip unreadable directories instead of aborting the search
+                print(f"Warning: Could not read directory {directory}: {e}")
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending_dirs.append(entry.path)
+                        continue
+                    # Extension check on the raw name (a leading dot is no extension, like Path.suffix)
+                    name = entry.name
+                    dot = name.rfind('.')
+                    if dot > 0 and name[dot:].lower() in extensions and entry.is_file():
+                        image_files.append(Path(entry.path))
                 
         print(f"Found: {len(image_files)} image files")
         self.stats['total_files'] = len(image_files)
         return image_files
     
-    def get_gps_coordinates(self, image_path: Path) -> Optional[Tuple[float, float]]:
-        """Extracts GPS coordinates from an image."""
-        if not self.include_gps:
-            return None
-            
-        try:
-            with Image.open(image_path) as img:
-                if hasattr(img, '_getexif') and img._getexif() is not None:
-                    exif = img._getexif()
-                    
-                    # Find GPS tags
-                    gps_tags = {}
-                    for tag_id in exif:
-                        tag = ExifTags.TAGS.get(tag_id, tag_id)
-                        if isinstance(tag, str) and tag.startswith('GPS'):
-                            gps_tags[tag] = exif[tag_id]
-                    
-                    # Extract GPS coordinates
-                    if 'GPSLatitude' in gps_tags and 'GPSLongitude' in gps_tags:
-                        try:
-                            lat = self._convert_to_degrees(gps_tags['GPSLatitude'])
-                            lon = self._convert_to_degrees(gps_tags['GPSLongitude'])
-                            
-                            # Consider GPS latitude reference
-                            if 'GPSLatitudeRef' in gps_tags and gps_tags['GPSLatitudeRef'] == 'S':
-                                lat = -lat
-                            
-                            # Consider GPS longitude reference
-                            if 'GPSLongitudeRef' in gps_tags and gps_tags['GPSLongitudeRef'] == 'W':
-                                lon = -lon
-                            
-                            self.stats['gps_files'] += 1
-                            return (lat, lon)
-                        except Exception as e:
-                            print(f"Error during GPS conversion for {image_path}: {e}")
-                    
-                    # Alternative: GPSInfo format (as seen in debug outputs)
-                    elif 'GPSInfo' in gps_tags:
-                        gps_info = gps_tags['GPSInfo']
-                        try:
-                            # GPSInfo has structure: {1: 'N', 2: (lat_deg, lat_min, lat_sec), 3: 'E', 4: (lon_deg, lon_min, lon_sec)}
-                            if 2 in gps_info and 4 in gps_info:
-                                lat_dms = gps_info[2]  # (degrees, minutes, seconds)
-                                lon_dms = gps_info[4]  # (degrees, minutes, seconds)
-                                
-                                lat = self._convert_to_degrees(lat_dms)
-                                lon = self._convert_to_degrees(lon_dms)
-                                
-                                # Consider reference
-                                if 1 in gps_info and gps_info[1] == 'S':
-                                    lat = -lat
-                                if 3 in gps_info and gps_info[3] == 'W':
-                                    lon = -lon
-                                
-                                self.stats['gps_files'] += 1
-                                return (lat, lon)
-                        except Exception as e:
-                            print(f"Error during GPSInfo conversion for {image_path}: {e}")
-                        
-        except Exception as e:
-            print(f"Warning: Could not read GPS data for {image_path}: {e}")
-        
-        return None
-    
-    def _convert_to_degrees(self, dms) -> float:
-        """Converts GPS coordinates from DMS (Degrees, Minutes, Seconds) to decimal degrees."""
-        degrees = float(dms[0])
-        minutes = float(dms[1])
-        seconds = float(dms[2])
-        
-        return degrees + (minutes / 60.0) + (seconds / 3600.0)
-    
-    def get_image_date(self, image_path: Path) -> Tuple[datetime, str]:
-        """Extracts the capture date from an image and returns date and source."""
-        try:
-            with Image.open(image_path) as img:
-                # Try to read EXIF data
-                if hasattr(img, '_getexif') and img._getexif() is not None:
-                    exif = img._getexif()
-                    
-                    # Search for DateTimeOriginal tag
-                    for tag_id in exif:
-                        tag = ExifTags.TAGS.get(tag_id, tag_id)
-                        if tag == 'DateTimeOriginal':
-                            date_str = exif[tag_id]
-                            try:
-                                # Parse EXIF date (format: YYYY:MM:DD HH:MM:SS)
-                                date = datetime.strptime(date_str, '%Y:%m:%d %H:%M:%S')
-                                self.stats['exif_files'] += 1
-                                return date, f"EXIF: {date_str}"
-                            except ValueError:
-                                pass
-                                
-        except Exception as e:
-            print(f"Warning: Could not read EXIF data for {image_path}: {e}")
-        
-        # Fallback: Use filesystem creation date
-        try:
-            stat = image_path.stat()
-            # Use the earliest available date
-            date = datetime.fromtimestamp(min(stat.st_ctime, stat.st_mtime))
-            self.stats['filesystem_date_files'] += 1
-            return date, f"Filesystem: {date.strftime('%Y-%m-%d %H:%M:%S')}"
-        except Exception as e:
-            print(f"Warning: Could not read filesystem date for {image_path}: {e}")
-            # Last fallback: Current date
-            date = datetime.now()
-            self.stats['current_date_files'] += 1
-            return date, f"Current date: {date.strftime('%Y-%m-%d %H:%M:%S')}"
-    
-    def get_subfolder_name(self, image_path: Path) -> str:
-        """Extracts the name of the subfolder relative to the source directory."""
-        if not self.include_dir:
-            return ""
-            
-        try:
-            # Relative path from source directory
-            relative_path = image_path.relative_to(self.source_dir)
-            
-            # If image is directly in source directory
-            if relative_path.parent == Path('.'):
-                return ""
-            
-            # Extract first subfolder name
-            subfolder = relative_path.parts[0]
-            return f"_{subfolder}_"
-            
-        except Exception:
-            return ""
-    
     def generate_new_filename(self, original_path: Path, date: datetime, gps_coords: Optional[Tuple[float, float]] = None, subfolder: str = "") -> str:
         """Generates a new filename based on date, GPS and subfolder."""
-        date_str = date.strftime('%Y%m%d_%H%M%S')
+        date_str = format_date_stamp(date)
         original_name = original_path.stem
         extension = original_path.suffix.lower()
         
         # Remove invalid characters from filename
-        safe_name = re.sub(r'[^\w\-_.]', '_', original_name)
+        safe_name = sanitize_name(original_name)
         
         # Build filename - GPS goes at the end
         filename_parts = [date_str]
@@ -218,48 +548,87 @@ class ImageSorter:
         return f"{'_'.join(filename_parts)}{extension}"
     
     def get_unique_filename(self, base_filename: str) -> str:
-        """Ensures that the filename is unique in the destination directory."""
-        if not self.dest_dir.exists():
-            return base_filename
-            
-        counter = 0
-        name, ext = os.path.splitext(base_filename)
-        
-        while True:
-            if counter == 0:
-                test_filename = base_filename
-            else:
+        """Ensures that the filename is unique in the destination directory and reserves it."""
+        test_filename = base_filename
+
+        if test_filename.casefold() in self._dest_names:
+            counter = 1
+            name, ext = os.path.splitext(base_filename)
+            test_filename = f"{name}_{counter}{ext}"
+
+            while test_filename.casefold() in self._dest_names:
+                counter += 1
                 test_filename = f"{name}_{counter}{ext}"
+
+        self._dest_names.add(test_filename.casefold())
+        return test_filename
+    
+    def copy_image(self, image_path: Path, dest_path: str, date: datetime,
+                   stat_result: Optional[os.stat_result] = None) -> None:
+        """Copies a single image to its destination path and sets its file time."""
+        if self.link_files:
+            try:
+                # A hard link shares times and permissions with the source image,
+                # so they are left alone (changing them would change the source)
+                os.link(image_path, dest_path)
+                return
+            except OSError:
+                pass
                 
-            if not (self.dest_dir / test_filename).exists():
-                return test_filename
-            counter += 1
+        copy_file_contents(image_path, dest_path)
+        
+        if self.preserve_times:
+            # Reuse the stat result from the analysis phase if there is one
+            if stat_result is None:
+                stat_result = image_path.stat()
+            os.chmod(dest_path, stat.S_IMODE(stat_result.st_mode))
+            os.utime(dest_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+        else:
+            # Date the copy by its capture date (best effort: e.g. pre-1970 dates
+            # fail on Windows, and the copy itself has succeeded at this point)
+            try:
+                timestamp = date.timestamp()
+                os.utime(dest_path, (timestamp, timestamp))
+            except (OSError, ValueError, OverflowError) as e:
+                print(f"Warning: Could not set file time of {dest_path}: {e}")
     
-    def create_gps_csv(self) -> None:
-        """Creates a CSV file with GPS data for Google Maps import."""
-        if not self.gps_data:
-            print("No GPS data found - CSV file will not be created.")
+    def write_gps_entry(self, filename: str, lat: float, lon: float, date_str: str) -> None:
+        """Writes an image position to the CSV file for Google Maps import, creating the file on first use."""
+        if self._gps_csv_failed:
             return
             
-        csv_filename = self.dest_dir / "gps_positions.csv"
-        
         try:
-            with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
+            if self._gps_csv_file is None:
+                csv_filename = self.dest_dir / "gps_positions.csv"
+                self._gps_csv_file = open(csv_filename, 'w', newline='', encoding='utf-8')
+                self._gps_csv_writer = csv.writer(self._gps_csv_file)
                 
                 # Header for Google Maps import
-                writer.writerow(['Name', 'Latitude', 'Longitude', 'Description'])
-                
-                # Write GPS data
-                for filename, lat, lon, date_str in self.gps_data:
-                    description = f"Photo taken on {date_str}"
-                    writer.writerow([filename, lat, lon, description])
-                    
-            print(f"GPS position data saved in: {csv_filename}")
-            print(f"CSV file contains {len(self.gps_data)} entries for Google Maps import")
+                self._gps_csv_writer.writerow(['Name', 'Latitude', 'Longitude', 'Description'])
+            
+            self._gps_csv_writer.writerow([filename, lat, lon, f"Photo taken on {date_str}"])
+            self.gps_entries += 1
             
         except Exception as e:
             print(f"Error creating CSV file: {e}")
+            self._gps_csv_failed = True
+    
+    def close_gps_csv(self) -> None:
+        """Closes the CSV file with GPS data and reports its contents."""
+        if self._gps_csv_file is None:
+            if not self._gps_csv_failed:
+                print("No GPS data found - CSV file will not be created.")
+            return
+            
+        try:
+            self._gps_csv_file.close()
+        except Exception as e:
+            print(f"Error creating CSV file: {e}")
+            return
+        
+        if not self._gps_csv_failed:
+            print(f"GPS position data saved in: {self._gps_csv_file.name}")
+            print(f"CSV file contains {self.gps_entries} entries for Google Maps import")
     
     def print_statistics(self) -> None:
         """Prints detailed statistics."""
@@ -278,10 +647,75 @@ class ImageSorter:
             print(f"  - GPS data found: {self.stats['gps_files']} ({self.stats['gps_files']/max(1, self.stats['total_files'])*100:.1f}%)")
         print("="*60)
     
+    def analyze_images(self, image_files: List[Path]) -> List[tuple]:
+        """
+        Analyzes all images in parallel and returns the analyze_image() results in input order.
+
+        With the metadata cache enabled, unchanged images are taken from the
+        cache and only new or modified ones are analyzed.
+        """
+        results = [None] * len(image_files)
+        pending = list(range(len(image_files)))
+        stat_results = stat_files(image_files)
+        cache = None
+        if self.use_cache:
+            try:
+                cache = MetadataCache(self.dest_dir / CACHE_FILENAME)
+            except sqlite3.Error as e:
+                print(f"Warning: Could not use metadata cache {CACHE_FILENAME}, analyzing all images: {e}")
+        
+        if cache is not None:
+            pending = []
+            for i, (image_path, stat_result) in enumerate(zip(image_files, stat_results)):
+                cached = cache.lookup(image_path, stat_result, self.include_gps) if stat_result else None
+                if cached is None:
+                    pending.append(i)
+                else:
+                    date, source, stats_key, gps_dms = cached
+                    subfolder = get_subfolder_name(image_path, self._source_prefix) if self.include_dir else ""
+                    results[i] = (image_path, date, source, stats_key, gps_dms, subfolder, stat_result)
+            
+            if len(pending) < len(image_files):
+                print(f"Metadata cache: {len(image_files) - len(pending)} unchanged images skipped")
+        
+        worker = partial(analyze_image, source_prefix=self._source_prefix,
+                         include_gps=self.include_gps, include_dir=self.include_dir)
+        if self.use_threads:
+            # Threads suit I/O-bound reads (e.g. network drives): no start-up or pickling cost
+            executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+        else:
+            # The default worker count is the CPU count, capped where Windows requires it
+            executor = ProcessPoolExecutor()
+        try:
+            with executor:
+                analyzed = executor.map(worker, [image_files[i] for i in pending], [stat_results[i] for i in pending],
+                                        chunksize=ANALYSIS_CHUNKSIZE)
+                for i, result in zip(pending, tqdm(analyzed, total=len(pending), desc="Analyzing images",
+                                                   miniters=max(1, len(pending) // PROGRESS_BAR_STEPS),
+                                                   **PROGRESS_BAR_OPTIONS)):
+                    results[i] = result
+        finally:
+            # Keep what was analyzed even if the run is interrupted
+            if cache is not None:
+                try:
+                    for i in pending:
+                        if results[i] is not None and stat_results[i] is not None:
+                            image_path, date, source, stats_key, gps_dms, _, _ = results[i]
+                            cache.store(image_path, stat_results[i], date, source, stats_key, self.include_gps, gps_dms)
+                    cache.close()
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not update metadata cache {CACHE_FILENAME}: {e}")
+        
+        return results
+    
     def sort_images(self) -> None:
         """Main function for sorting images."""
         # Create destination directory if it doesn't exist
         self.dest_dir.mkdir(parents=True, exist_ok=True)
+
+        # List the destination once instead of probing every candidate name
+        with os.scandir(self.dest_dir) as entries:
+            self._dest_names = {entry.name.casefold() for entry in entries}
         
         # Find all image files
         image_files = self.find_image_files()
@@ -290,62 +724,104 @@ class ImageSorter:
             print("No image files found.")
             return
         
+        # Hard links only work within one filesystem
+        if self.link_files and os.stat(self.source_dir).st_dev != os.stat(self.dest_dir).st_dev:
+            print("Source and destination are on different filesystems, copying instead of linking")
+            self.link_files = False
+        
         # Collect images with their data
         print("Analyzing image data...")
-        images_with_data = []
-        
-        for image_path in tqdm(image_files, desc="Analyzing images"):
-            try:
-                date, source = self.get_image_date(image_path)
-                gps_coords = self.get_gps_coordinates(image_path)
-                subfolder = self.get_subfolder_name(image_path)
-                images_with_data.append((image_path, date, source, gps_coords, subfolder))
-            except Exception as e:
-                print(f"Error analyzing {image_path}: {e}")
-                self.stats['error_files'] += 1
+
+        results = self.analyze_images(image_files)
+
+        # Tally statistics in the main process
+        analyzed = []
+        for image_path, date, source, stats_key, gps_dms, subfolder, stat_result in results:
+            self.stats[stats_key] += 1
+            if date is None:
+                print(f"Error analyzing {image_path}: {source}")
+                continue
+            if gps_dms:
+                self.stats['gps_files'] += 1
+            analyzed.append((image_path, date, source, gps_dms, subfolder, stat_result))
+
+        # Keep the records as parallel columns (struct of arrays)
+        if analyzed:
+            paths, dates, sources, gps_dms, subfolders, stat_results = zip(*analyzed)
+        else:
+            paths = dates = sources = gps_dms = subfolders = stat_results = ()
+
+        # Convert the GPS coordinates of all images at once
+        lats = np.full(len(paths), np.nan)
+        lons = np.full(len(paths), np.nan)
+        gps_indices = [i for i, dms in enumerate(gps_dms) if dms]
+        if gps_indices:
+            lats[gps_indices], lons[gps_indices] = dms_to_degrees([gps_dms[i] for i in gps_indices])
+        lats, lons = lats.tolist(), lons.tolist()
         
         # Sort by date (oldest first) - GPS and directory have no influence
-        images_with_data.sort(key=lambda x: x[1])
+        order = np.argsort(np.array(dates, dtype='datetime64[us]'), kind='stable').tolist()
         
         # Copy and rename
-        print(f"Copying {len(images_with_data)} images...")
+        print(f"Copying {len(order)} images...")
         
-        for image_path, date, source, gps_coords, subfolder in tqdm(images_with_data, desc="Copying images"):
+        # Names are assigned here in date order; only the copies run concurrently
+        with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+            copy_jobs = []
             try:
-                new_filename = self.generate_new_filename(image_path, date, gps_coords, subfolder)
-                unique_filename = self.get_unique_filename(new_filename)
-                dest_path = self.dest_dir / unique_filename
-                
-                shutil.copy2(image_path, dest_path)
-                
-                # Collect GPS data for CSV
-                if gps_coords and self.include_gps:
-                    lat, lon = gps_coords
-                    date_str = date.strftime('%Y-%m-%d %H:%M:%S')
-                    self.gps_data.append((unique_filename, lat, lon, date_str))
-                
-                # Create info string for output
-                info_parts = [source]
-                if gps_coords:
-                    lat, lon = gps_coords
-                    info_parts.append(f"GPS: {lat:.6f},{lon:.6f}")
-                if subfolder:
-                    info_parts.append(f"Folder: {subfolder.strip('_')}")
-                
-                info_str = " | ".join(info_parts)
-                print(f"Copied: {image_path.name} -> {unique_filename} ({info_str})")
-                self.stats['copied_files'] += 1
-                
-            except Exception as e:
-                print(f"Error copying {image_path}: {e}")
-                self.stats['error_files'] += 1
+                for i in order:
+                    image_path, date, source, subfolder, stat_result = paths[i], dates[i], sources[i], subfolders[i], stat_results[i]
+                    gps_coords = (lats[i], lons[i]) if gps_dms[i] else None
+                    new_filename = self.generate_new_filename(image_path, date, gps_coords, subfolder)
+                    unique_filename = self.get_unique_filename(new_filename)
+                    future = executor.submit(self.copy_image, image_path, self._dest_str + unique_filename, date, stat_result)
+                    copy_jobs.append((future, image_path, date, source, gps_coords, subfolder, unique_filename))
+
+                copy_log = []
+                progress = tqdm(copy_jobs, desc="Copying images",
+                                miniters=max(1, len(copy_jobs) // PROGRESS_BAR_STEPS), **PROGRESS_BAR_OPTIONS)
+                for future, image_path, date, source, gps_coords, subfolder, unique_filename in progress:
+                    try:
+                        future.result()
+                        
+                        # Collect GPS data for CSV
+                        if gps_coords and self.include_gps:
+                            lat, lon = gps_coords
+                            date_str = format_date_time(date)
+                            self.write_gps_entry(unique_filename, lat, lon, date_str)
+                        
+                        # Create info string for output
+                        if self.verbose:
+                            info_parts = [source]
+                            if gps_coords:
+                                lat, lon = gps_coords
+                                info_parts.append(f"GPS: {lat:.6f},{lon:.6f}")
+                            if subfolder:
+                                info_parts.append(f"Folder: {subfolder.strip('_')}")
+                            
+                            info_str = " | ".join(info_parts)
+                            copy_log.append(f"Copied: {image_path.name} -> {unique_filename} ({info_str})")
+                        self.stats['copied_files'] += 1
+                        
+                    except Exception as e:
+                        print(f"Error copying {image_path}: {e}")
+                        self.stats['error_files'] += 1
+            except BaseException:
+                # Drop the queued copies so an interrupt (Ctrl-C) only waits for the running ones
+                for job in copy_jobs:
+                    job[0].cancel()
+                raise
+
+        # Per-file details are written in one go once copying is done
+        if copy_log:
+            print('\n'.join(copy_log))
         
         print(f"\nDone! {self.stats['copied_files']} images were sorted and copied.")
         print(f"Destination directory: {self.dest_dir}")
         
-        # Create CSV file for GPS data
+        # Finish the CSV file for GPS data
         if self.include_gps:
-            self.create_gps_csv()
+            self.close_gps_csv()
         
         # Show statistics
         self.print_statistics()
@@ -388,10 +864,41 @@ Examples:
         help='Embed subfolder names in filename'
     )
     
+    parser.add_argument(
+        '--preserve-times',
+        action='store_true',
+        help='Preserve file timestamps and permissions of the source images (default: file time is set to the capture date)'
+    )
+    
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print details for each copied image'
+    )
+    
+    parser.add_argument(
+        '--threads',
+        action='store_true',
+        help='Analyze images with threads instead of processes (faster for network drives and small batches)'
+    )
+    
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help=f'Cache image metadata in the destination directory ({CACHE_FILENAME}) to speed up repeated runs'
+    )
+    
+    parser.add_argument(
+        '--link',
+        action='store_true',
+        help='Create hard links instead of copies if source and destination are on the same filesystem'
+    )
+    
     args = parser.parse_args()
     
     try:
-        sorter = ImageSorter(args.source, args.dest, args.gps, args.dir)
+        sorter = ImageSorter(args.source, args.dest, args.gps, args.dir, args.preserve_times, args.verbose,
+                             args.threads, args.cache, args.link)
         sorter.sort_images()
     except KeyboardInterrupt:
         print("\nAborted by user.")